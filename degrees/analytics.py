@@ -0,0 +1,142 @@
+import json
+import random
+import sys
+from array import array
+from collections import deque
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from degrees import load_data, people, movies
+from graph import CompactGraph
+
+# CSR arrays of a CompactGraph shared with the workers, by attribute name
+SHARED_ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+
+# Shared arrays attached by each worker process
+_shared = {}
+_blocks = []
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python analytics.py directory [samples] [processes]")
+    directory = sys.argv[1]
+    samples = int(sys.argv[2]) if len(sys.argv) >= 3 else 100
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    print("Loading data...", file=sys.stderr)
+    load_data(directory)
+    graph = CompactGraph.from_data(people, movies)
+    print("Data loaded.", file=sys.stderr)
+
+    sources = random.sample(graph.person_ids, min(samples, len(graph.person_ids)))
+    print(json.dumps(analyze(graph, sources, processes)))
+
+
+def analyze(graph, sources, processes=None):
+    """
+    Runs one BFS per source person_id across a process pool and returns
+    a dict with the combined separation histogram, the average separation
+    over connected pairs, and each source's eccentricity.
+    """
+    blocks, layout = share_graph(graph)
+    try:
+        with Pool(processes, initializer=_attach, initargs=(layout,)) as pool:
+            dense = [graph.person_index[person_id] for person_id in sources]
+            results = pool.map(_separations, dense, chunksize=max(1, len(dense) // 64))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    histogram = {}
+    eccentricities = {}
+    for person_id, counts in zip(sources, results):
+        for distance, count in enumerate(counts):
+            if count:
+                histogram[distance] = histogram.get(distance, 0) + count
+        eccentricities[person_id] = len(counts) - 1
+
+    pairs = sum(count for distance, count in histogram.items() if distance > 0)
+    total = sum(distance * count for distance, count in histogram.items())
+    return {
+        "sources": len(sources),
+        "histogram": histogram,
+        "average_separation": total / pairs if pairs else None,
+        "eccentricities": eccentricities,
+    }
+
+
+def bacon_numbers(graph, person_id):
+    """
+    Returns a list whose i-th entry counts the people exactly i degrees
+    away from `person_id`, computed in this process.
+    """
+    for name in SHARED_ARRAYS:
+        _shared[name] = getattr(graph, name)
+    return _separations(graph.person_index[person_id])
+
+
+def share_graph(graph):
+    """
+    Copies the CSR arrays of `graph` into shared memory blocks.
+    Returns the blocks and a layout describing them for `_attach`.
+    """
+    blocks = []
+    layout = []
+    for name in SHARED_ARRAYS:
+        values = getattr(graph, name)
+        size = max(1, len(values) * values.itemsize)
+        block = SharedMemory(create=True, size=size)
+        block.buf[:len(values) * values.itemsize] = values.tobytes()
+        blocks.append(block)
+        layout.append((name, block.name, values.typecode, len(values)))
+    return blocks, layout
+
+
+def _attach(layout):
+    """
+    Pool initializer mapping the shared CSR arrays into this worker read-only.
+    """
+    for name, block_name, typecode, length in layout:
+        block = SharedMemory(name=block_name)
+        _blocks.append(block)
+        view = block.buf.cast("B")[:length * array(typecode).itemsize].cast(typecode)
+        _shared[name] = view.toreadonly()
+
+
+def _separations(source):
+    """
+    BFS from a dense person id over the attached arrays, returning how
+    many people sit at each distance from it.
+    """
+    person_offsets = _shared["person_offsets"]
+    person_movies = _shared["person_movies"]
+    movie_offsets = _shared["movie_offsets"]
+    movie_people = _shared["movie_people"]
+
+    depth = array("i", [-1]) * (len(person_offsets) - 1)
+    seen_movies = bytearray(len(movie_offsets) - 1)
+    depth[source] = 0
+    counts = [1]
+
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        distance = depth[person] + 1
+        for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                if depth[star] == -1:
+                    depth[star] = distance
+                    if distance == len(counts):
+                        counts.append(0)
+                    counts[distance] += 1
+                    frontier.append(star)
+    return counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import csv
+import json
+import sys
+
+import degrees
+from degrees import load_data, bfs_tree, path_from_tree
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python batch.py directory [pairs.csv]")
+    directory = sys.argv[1]
+
+    print("Loading data...", file=sys.stderr)
+    load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], encoding="utf-8", newline="") as f:
+            pairs = read_pairs(f)
+    else:
+        pairs = read_pairs(sys.stdin)
+
+    for result in answer_pairs(pairs):
+        print(json.dumps(result), flush=True)
+
+
+def read_pairs(lines):
+    """
+    Returns a list of (source, target) pairs, one per CSV row of `lines`.
+    Each side may be a person_id or a name.
+    """
+    pairs = []
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        if len(row) != 2:
+            raise ValueError(f"Expected 'source,target', got {row!r}")
+        pairs.append((row[0].strip(), row[1].strip()))
+    return pairs
+
+
+def resolve_person(text):
+    """
+    Returns the person_id for a person_id or an unambiguous name,
+    or None if there is no such person or the name is ambiguous.
+    """
+    if text in degrees.people:
+        return text
+    person_ids = degrees.names.get(text.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def answer_pairs(pairs):
+    """
+    Yields one result dict per (source, target) pair.
+
+    Pairs are grouped by source so that a single BFS tree answers every
+    target of a source; results are yielded group by group and carry
+    the `line` index of their pair in the input.
+    """
+    groups = {}
+    for line, (source, target) in enumerate(pairs):
+        groups.setdefault(resolve_person(source), []).append((line, source, target))
+
+    for source_id, queries in groups.items():
+        target_ids = {query: resolve_person(query[2]) for query in queries}
+        if source_id is not None:
+            wanted = [target_id for target_id in target_ids.values() if target_id is not None]
+            parents = bfs_tree(source_id, wanted)
+
+        for query in queries:
+            line, source, target = query
+            result = {"line": line, "source": source, "target": target}
+            target_id = target_ids[query]
+            if source_id is None or target_id is None:
+                result["error"] = "Person not found."
+            else:
+                path = path_from_tree(parents, target_id)
+                result["degrees"] = None if path is None else len(path)
+                result["path"] = path
+            yield result
+
+
+if __name__ == "__main__":
+    main()
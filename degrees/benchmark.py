@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+import degrees
+from degrees import load_data, shortest_path, bidirectional_shortest_path, lean_shortest_path
+from filters import YearIndex
+from graph import CompactGraph
+from landmarks import LandmarkOracle
+from loader import stream_load_data
+
+# Loaders timed by `run`, in order; "csv_write_snapshot" writes the
+# snapshot that "snapshot" then reads
+LOADERS = ("csv", "csv_write_snapshot", "snapshot", "stream")
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python benchmark.py directory [queries] [seed]")
+    directory = sys.argv[1]
+    queries = int(sys.argv[2]) if len(sys.argv) >= 3 else 100
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+    print(json.dumps(run(directory, queries, seed), indent=2))
+
+
+def run(directory, queries=100, seed=0):
+    """
+    Times every loader and search mode on the dataset in `directory`.
+
+    Returns a dict with, per loader, its seconds and peak RSS in a fresh
+    process; per index, its build seconds; and per search mode, latency
+    percentiles in milliseconds over the same `queries` random pairs.
+
+    The loaders write and read `snapshot.pickle` in `directory`; a
+    snapshot that was already there is set aside and restored afterwards.
+    """
+    results = {"directory": directory, "queries": queries, "seed": seed}
+
+    snapshot = os.path.join(directory, degrees.SNAPSHOT)
+    backup = snapshot + ".benchmark"
+    if os.path.exists(snapshot):
+        os.replace(snapshot, backup)
+    try:
+        results["load"] = {mode: _time_load(mode, directory) for mode in LOADERS}
+    finally:
+        if os.path.exists(backup):
+            os.replace(backup, snapshot)
+        elif os.path.exists(snapshot):
+            os.remove(snapshot)
+
+    load_data(directory, use_snapshot=False)
+
+    builds = {}
+    start = time.perf_counter()
+    degrees.build_components()
+    builds["components"] = time.perf_counter() - start
+    start = time.perf_counter()
+    graph = CompactGraph.from_data(degrees.people, degrees.movies)
+    builds["compact_graph"] = time.perf_counter() - start
+    start = time.perf_counter()
+    oracle = LandmarkOracle(graph=graph)
+    builds["landmarks"] = time.perf_counter() - start
+    start = time.perf_counter()
+    year_index = YearIndex()
+    builds["year_index"] = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(queries)]
+
+    modes = {
+        "bfs": shortest_path,
+        "bidirectional": bidirectional_shortest_path,
+        "lean": lean_shortest_path,
+        "compact": graph.shortest_path,
+        "landmark_astar": oracle.shortest_path,
+        "year_index": year_index.shortest_path,
+    }
+    latencies = {name: _time_queries(search, pairs) for name, search in modes.items()}
+
+    start = time.perf_counter()
+    degrees.build_costar_index()
+    builds["costar_index"] = time.perf_counter() - start
+    latencies["bidirectional_costar_index"] = _time_queries(bidirectional_shortest_path, pairs)
+
+    results["build_seconds"] = builds
+    results["latency_ms"] = latencies
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def _time_load(mode, directory):
+    """
+    Runs loader `mode` in a fresh process, so its peak RSS is its own.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_load, (mode, directory))
+
+
+def _load(mode, directory):
+    start = time.perf_counter()
+    if mode == "csv":
+        load_data(directory, use_snapshot=False)
+    elif mode == "stream":
+        stream_load_data(directory)
+    else:
+        load_data(directory)
+    return {"seconds": time.perf_counter() - start, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _time_queries(search, pairs):
+    """
+    Returns latency percentiles in milliseconds of `search` over `pairs`.
+    """
+    timings = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        search(source, target)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50": _percentile(timings, 50),
+        "p90": _percentile(timings, 90),
+        "p99": _percentile(timings, 99),
+        "max": timings[-1] if timings else None,
+        "mean": sum(timings) / len(timings) if timings else None,
+    }
+
+
+def _percentile(values, percent):
+    """
+    Returns the nearest-rank percentile of sorted `values`.
+    """
+    if not values:
+        return None
+    rank = max(0, -(-len(values) * percent // 100) - 1)
+    return values[rank]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    main()
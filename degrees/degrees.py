@@ -1,8 +1,13 @@
 import csv
+import gc
+import os
+import pickle
 import sys
 import queue
+from collections import OrderedDict, deque
 from util import Node, StackFrontier, QueueFrontier
 from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -13,11 +18,41 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps person_ids to a tuple of (movie_id, person_id) pairs, one per co-star,
+# filled in by build_costar_index
+costars = {}
 
-def load_data(directory):
+# Recently expanded people left out of `costars` for having too many co-stars
+hub_costars = OrderedDict()
+hub_cache_size = 0
+
+# Union-find forest over person_ids, built lazily by build_components
+component_parent = {}
+
+# Maps each component root to the number of people in it
+component_sizes = {}
+
+# Bumped whenever data is loaded or added, so copies of it can tell they are stale
+data_version = 0
+
+
+# Binary snapshot of the parsed CSVs as a CompactGraph, written next to
+# them on first load
+SNAPSHOT = "snapshot.pickle"
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def load_data(directory, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    If `use_snapshot` is true, a snapshot that still matches the CSV
+    files is loaded instead, and a fresh one is written after parsing.
     """
+    clear_indexes()
+    if use_snapshot and load_snapshot(directory):
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)    # dictreader means every reader is a dict which has key(like "id") and value
@@ -52,6 +87,209 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    if use_snapshot:
+        save_snapshot(directory)
+
+
+def csv_signature(directory):
+    """
+    Returns the (filename, size, mtime) of each CSV file in `directory`.
+    """
+    signature = []
+    for filename in CSV_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        signature.append((filename, stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def save_snapshot(directory):
+    """
+    Write `people` and `movies` to the snapshot in `directory`, as the
+    flat arrays of a CompactGraph. Silently gives up if the directory is
+    not writable.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    graph = CompactGraph.from_data(people, movies)
+    try:
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump((csv_signature(directory), graph), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def load_snapshot(directory):
+    """
+    Fill `names`, `people` and `movies` from the snapshot in `directory`.
+    Returns False if there is no snapshot or the CSV files changed since.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            signature, graph = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        return False
+    if signature != csv_signature(directory):
+        return False
+
+    # None of the dicts and sets made here can be part of a cycle, so the
+    # collector's passes over them are wasted
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        person_ids = graph.person_ids
+        movie_ids = graph.movie_ids
+        for person, person_id in enumerate(person_ids):
+            name = graph.person_names[person]
+            people[person_id] = {
+                "name": name,
+                "birth": graph.person_births[person],
+                "movies": set(map(movie_ids.__getitem__, graph.movies_of(person))),
+            }
+            if name.lower() not in names:
+                names[name.lower()] = {person_id}
+            else:
+                names[name.lower()].add(person_id)
+        for movie, movie_id in enumerate(movie_ids):
+            movies[movie_id] = {
+                "title": graph.movie_titles[movie],
+                "year": graph.movie_years[movie],
+                "stars": set(map(person_ids.__getitem__, graph.stars_of(movie))),
+            }
+    finally:
+        if collecting:
+            gc.enable()
+    return True
+
+
+# Columns each delta CSV must have, by filename
+DELTA_COLUMNS = {
+    "people.csv": ("id", "name", "birth"),
+    "movies.csv": ("id", "title", "year"),
+    "stars.csv": ("person_id", "movie_id"),
+}
+
+
+def load_delta(directory):
+    """
+    Append the rows of any people.csv, movies.csv and stars.csv found in
+    `directory` to the loaded data, updating derived indexes in place.
+
+    Returns a dict counting added people, movies and stars, and rows
+    skipped for missing fields or, for stars, unknown people or movies.
+    Raises ValueError, before anything is appended, if a file lacks one
+    of its columns.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"No delta directory {directory!r}")
+    paths = {}
+    for filename, columns in DELTA_COLUMNS.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"{filename} is missing columns: {', '.join(missing)}")
+        paths[filename] = path
+
+    counts = {"people": 0, "movies": 0, "stars": 0, "skipped": 0}
+    adders = {"people.csv": add_person, "movies.csv": add_movie, "stars.csv": add_star}
+    for filename, path in paths.items():
+        columns = DELTA_COLUMNS[filename]
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                values = [row[column] for column in columns]
+                if None in values:
+                    counts["skipped"] += 1
+                    continue
+                try:
+                    if adders[filename](*values):
+                        counts[filename[:-4]] += 1
+                except KeyError:
+                    counts["skipped"] += 1
+    return counts
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person with no movies yet. Returns False if the id already exists.
+    """
+    global data_version
+    if person_id in people:
+        return False
+    people[person_id] = {
+        "name": name,
+        "birth": birth,
+        "movies": set(),
+    }
+    names.setdefault(name.lower(), set()).add(person_id)
+    data_version += 1
+    if component_parent:
+        component_parent[person_id] = person_id
+        component_sizes[person_id] = 1
+    return True
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie with no stars yet. Returns False if the id already exists.
+    """
+    global data_version
+    if movie_id in movies:
+        return False
+    movies[movie_id] = {
+        "title": title,
+        "year": year,
+        "stars": set()
+    }
+    data_version += 1
+    return True
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie, updating the co-star and
+    component indexes in place. Returns False if that was already known.
+
+    Raises KeyError for an unknown person or movie.
+    """
+    global data_version
+    person = people[person_id]
+    movie = movies[movie_id]
+    if movie_id in person["movies"]:
+        return False
+
+    if costars or hub_costars:
+        _link_costars(person_id, movie_id)
+    if component_parent:
+        for star_id in movie["stars"]:
+            union_components(person_id, star_id)
+            break
+
+    person["movies"].add(movie_id)
+    movie["stars"].add(person_id)
+    data_version += 1
+    return True
+
+
+def _link_costars(person_id, movie_id):
+    """
+    Adds the co-star pairs created by a new star edge to the co-star index.
+    """
+    known = set(costar_id for _, costar_id in costars_for_person(person_id))
+    new_costars = [
+        star_id for star_id in movies[movie_id]["stars"]
+        if star_id != person_id and star_id not in known
+    ]
+    for star_id in new_costars:
+        if star_id in costars:
+            costars[star_id] += ((movie_id, person_id),)
+        hub_costars.pop(star_id, None)
+    if person_id in costars:
+        costars[person_id] += tuple((movie_id, star_id) for star_id in new_costars)
+    hub_costars.pop(person_id, None)
+
 
 def main():
     if len(sys.argv) > 2:
@@ -70,7 +308,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -92,6 +330,8 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if not connected(source, target):
+        return None
     frontier = QueueFrontier()
     path = []
     explored = set()
@@ -99,7 +339,7 @@ def shortest_path(source, target):
     while not frontier.empty():
         node = frontier.remove()
         explored.add(node.state)
-        neighbors = neighbors_for_person(node.state)
+        neighbors = costars_for_person(node.state)
         # to check and output， 注意Node的parent引用
         for neighbor in neighbors:
             person_id = neighbor[1]
@@ -119,6 +359,234 @@ def shortest_path(source, target):
     # raise NotImplementedError
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one BFS
+    frontier from each end until they meet in the middle.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    if not connected(source, target):
+        return None
+
+    # Maps person_id to (previous person_id, movie_id) towards the source
+    forward = {source: None}
+    # Maps person_id to (next person_id, movie_id) towards the target
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        # Always expand the smaller layer, the co-star graph is undirected
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meet = _expand_layer(forward_layer, forward, backward)
+        else:
+            backward_layer, meet = _expand_layer(backward_layer, backward, forward)
+        if meet is not None:
+            return _join_paths(meet, forward, backward)
+    return None
+
+
+def _expand_layer(layer, parents, other_parents):
+    """
+    Expands every person in `layer` by one step, recording parents.
+    Returns the next layer and a person reached from both sides, if any.
+    """
+    next_layer = []
+    for person_id in layer:
+        for movie_id, neighbor_id in costars_for_person(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (person_id, movie_id)
+            if neighbor_id in other_parents:
+                return next_layer, neighbor_id
+            next_layer.append(neighbor_id)
+    return next_layer, None
+
+
+def _join_paths(meet, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through the meeting person.
+    """
+    path = path_from_tree(forward, meet)
+
+    person_id = meet
+    while backward[person_id] is not None:
+        next_id, movie_id = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
+def bfs_tree(source, targets=None, max_people=None):
+    """
+    Runs a BFS from `source` and returns a dict mapping every reached
+    person_id to its (parent person_id, movie_id), with None for the source.
+
+    If `targets` is given, stops as soon as all of them have been reached.
+    If `max_people` is given, stops once that many people have been
+    reached; the tree then holds the people nearest to `source`, each
+    still with a shortest path back to it.
+    """
+    parents = {source: None}
+    remaining = None
+    if targets is not None:
+        # Targets in other components would make the search exhaust this one
+        remaining = set(
+            target for target in targets
+            if target != source and connected(source, target)
+        )
+    if remaining is not None and not remaining:
+        return parents
+
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        for movie_id, neighbor_id in costars_for_person(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (person_id, movie_id)
+            frontier.append(neighbor_id)
+            if max_people is not None and len(parents) >= max_people:
+                return parents
+            if remaining is not None:
+                remaining.discard(neighbor_id)
+                if not remaining:
+                    return parents
+    return parents
+
+
+def path_from_tree(parents, target):
+    """
+    Returns the list of (movie_id, person_id) pairs leading from the root
+    of a `bfs_tree` to `target`, or None if the tree does not reach it.
+    """
+    if target not in parents:
+        return None
+    path = []
+    person_id = target
+    while parents[person_id] is not None:
+        parent_id, movie_id = parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+    return path
+
+
+def build_components():
+    """
+    Labels every person with their connected component, using a
+    union-find over the stars of each movie.
+    """
+    component_parent.clear()
+    component_sizes.clear()
+    for person_id in people:
+        component_parent[person_id] = person_id
+        component_sizes[person_id] = 1
+    for movie in movies.values():
+        stars = iter(movie["stars"])
+        first = next(stars, None)
+        for person_id in stars:
+            union_components(first, person_id)
+
+
+def find_component(person_id):
+    """
+    Returns the root person_id of the component containing `person_id`.
+    """
+    if not component_parent:
+        build_components()
+    parent = component_parent[person_id]
+    while parent != person_id:
+        # Path halving keeps the trees shallow
+        grandparent = component_parent[parent]
+        component_parent[person_id] = grandparent
+        person_id, parent = grandparent, component_parent[grandparent]
+    return person_id
+
+
+def union_components(person_a, person_b):
+    """
+    Merges the components of two people, keeping `component_sizes` current.
+    """
+    root_a = find_component(person_a)
+    root_b = find_component(person_b)
+    if root_a == root_b:
+        return root_a
+    size_a = component_sizes.pop(root_a)
+    size_b = component_sizes.pop(root_b)
+    if size_a < size_b:
+        root_a, root_b = root_b, root_a
+    component_parent[root_b] = root_a
+    component_sizes[root_a] = size_a + size_b
+    return root_a
+
+
+def connected(source, target):
+    """
+    Returns whether two people are in the same connected component.
+    """
+    return find_component(source) == find_component(target)
+
+
+def component_size(person_id):
+    """
+    Returns the number of people in the component of `person_id`,
+    which also bounds how many people a search from them can visit.
+    """
+    return component_sizes[find_component(person_id)]
+
+
+def lean_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, recording parents in
+    flat dicts keyed by person instead of allocating Node objects.
+
+    If no possible path, returns None. If `stats` is a dict, it is
+    filled with the number of allocations made by the search: one parent
+    record per discovered person (its parent and via-movie) plus one per
+    frontier entry, along with those two counts and the peak frontier size.
+    """
+    parent_of = {source: None}
+    movie_of = {}
+    frontier = deque([source])
+    enqueued = 1
+    peak_frontier = 1
+    path = None
+
+    if source == target:
+        path = []
+    elif connected(source, target):
+        while frontier and path is None:
+            person_id = frontier.popleft()
+            for movie_id, neighbor_id in costars_for_person(person_id):
+                if neighbor_id in parent_of:
+                    continue
+                parent_of[neighbor_id] = person_id
+                movie_of[neighbor_id] = movie_id
+                if neighbor_id == target:
+                    path = []
+                    while neighbor_id != source:
+                        path.append((movie_of[neighbor_id], neighbor_id))
+                        neighbor_id = parent_of[neighbor_id]
+                    path.reverse()
+                    break
+                frontier.append(neighbor_id)
+                enqueued += 1
+            peak_frontier = max(peak_frontier, len(frontier))
+
+    if stats is not None:
+        stats["parent_records"] = len(parent_of)
+        stats["frontier_entries"] = enqueued
+        stats["allocations"] = len(parent_of) + enqueued
+        stats["peak_frontier"] = peak_frontier
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -158,5 +626,73 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def clear_indexes():
+    """
+    Drops the co-star and component indexes derived from the loaded data,
+    so they are rebuilt for the data loaded next, and bumps `data_version`.
+    """
+    global hub_cache_size, data_version
+    costars.clear()
+    hub_costars.clear()
+    hub_cache_size = 0
+    component_parent.clear()
+    component_sizes.clear()
+    data_version += 1
+
+
+def build_costar_index(max_costars=None, cache_size=1024):
+    """
+    Precomputes the deduplicated co-stars of every person into `costars`.
+
+    People with more than `max_costars` co-stars are left out of the
+    index; their co-stars are computed on demand and kept in an LRU
+    cache of at most `cache_size` people instead.
+    """
+    global hub_cache_size
+    costars.clear()
+    hub_costars.clear()
+    hub_cache_size = cache_size
+    for person_id in people:
+        pairs = _compute_costars(person_id)
+        if max_costars is None or len(pairs) <= max_costars:
+            costars[person_id] = pairs
+
+
+def costars_for_person(person_id):
+    """
+    Returns (movie_id, person_id) pairs with one entry per distinct
+    co-star of a given person, using the co-star index when built.
+    """
+    pairs = costars.get(person_id)
+    if pairs is not None:
+        return pairs
+    if not hub_cache_size:
+        return _compute_costars(person_id)
+
+    pairs = hub_costars.get(person_id)
+    if pairs is not None:
+        hub_costars.move_to_end(person_id)
+        return pairs
+    pairs = _compute_costars(person_id)
+    hub_costars[person_id] = pairs
+    if len(hub_costars) > hub_cache_size:
+        hub_costars.popitem(last=False)
+    return pairs
+
+
+def _compute_costars(person_id):
+    """
+    Returns a tuple of (movie_id, person_id) pairs, keeping the first
+    movie found for each co-star and leaving out the person themselves.
+    """
+    via = {}
+    for movie_id in people[person_id]["movies"]:
+        for costar_id in movies[movie_id]["stars"]:
+            if costar_id not in via:
+                via[costar_id] = movie_id
+    via.pop(person_id, None)
+    return tuple((movie_id, costar_id) for costar_id, movie_id in via.items())
+
+
 if __name__ == "__main__":
     main()
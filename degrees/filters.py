@@ -0,0 +1,89 @@
+import bisect
+from collections import deque
+
+import degrees
+from degrees import connected, path_from_tree
+from paths import movie_year
+
+
+class YearIndex():
+    """
+    Each person's movies sorted by release year, so searches can keep
+    to a range of years by bisecting instead of filtering `movies`.
+    """
+
+    def __init__(self):
+        # Maps person_id to (sorted years, movie_ids in the same order)
+        self.by_person = {}
+        for person_id, person in degrees.people.items():
+            dated = sorted(
+                (movie_year(movie_id), movie_id)
+                for movie_id in person["movies"]
+            )
+            self.by_person[person_id] = (
+                [year for year, _ in dated],
+                [movie_id for _, movie_id in dated],
+            )
+
+    def movies_for_person(self, person_id, start=None, end=None):
+        """
+        Returns the movie_ids of a person released between `start` and
+        `end` inclusive. Movies without a known year only pass when no
+        range is given.
+        """
+        years, movie_ids = self.by_person[person_id]
+        if start is None and end is None:
+            return movie_ids
+        # Unknown years are stored as 0 and sort first
+        low = bisect.bisect_left(years, 1 if start is None else max(start, 1))
+        high = len(years) if end is None else bisect.bisect_right(years, end)
+        return movie_ids[low:high]
+
+    def neighbors_for_person(self, person_id, start=None, end=None, movie_filter=None):
+        """
+        Returns (movie_id, person_id) pairs for people who starred with
+        a given person in a movie within the year range that also passes
+        `movie_filter(movie_id)`, if given.
+        """
+        neighbors = set()
+        for movie_id in self.movies_for_person(person_id, start, end):
+            if movie_filter is not None and not movie_filter(movie_id):
+                continue
+            for star_id in degrees.movies[movie_id]["stars"]:
+                neighbors.add((movie_id, star_id))
+        return neighbors
+
+    def shortest_path(self, source, target, start=None, end=None, movie_filter=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target using only movies within the
+        year range that pass `movie_filter(movie_id)`, if given.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+        if not connected(source, target):
+            return None
+
+        parents = {source: None}
+        # A movie's stars all join the frontier the first time it is reached
+        seen_movies = set()
+        frontier = deque([source])
+        while frontier:
+            person_id = frontier.popleft()
+            for movie_id in self.movies_for_person(person_id, start, end):
+                if movie_id in seen_movies:
+                    continue
+                seen_movies.add(movie_id)
+                if movie_filter is not None and not movie_filter(movie_id):
+                    continue
+                for star_id in degrees.movies[movie_id]["stars"]:
+                    if star_id in parents:
+                        continue
+                    parents[star_id] = (person_id, movie_id)
+                    if star_id == target:
+                        return path_from_tree(parents, target)
+                    frontier.append(star_id)
+        return None
+
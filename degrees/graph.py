@@ -0,0 +1,216 @@
+import csv
+from array import array
+from collections import deque
+
+
+class CompactGraph():
+    """
+    Co-star graph with people and movies mapped to dense integers.
+
+    Person->movie and movie->person adjacency is stored as compressed
+    sparse row arrays: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    same layout holds for the stars of each movie.
+    """
+
+    def __init__(self):
+        # Dense index <-> IMDB id
+        self.person_ids = []
+        self.person_index = {}
+        self.movie_ids = []
+        self.movie_index = {}
+
+        # Display fields, indexed by dense id
+        self.person_names = []
+        self.person_births = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # CSR adjacency
+        self.person_offsets = array("q", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("q", [0])
+        self.movie_people = array("i")
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build a compact graph from the `people` and `movies` dicts
+        filled in by `degrees.load_data`.
+        """
+        graph = cls()
+        for person_id, person in people.items():
+            graph._add_person(person_id, person["name"], person["birth"])
+        for movie_id, movie in movies.items():
+            graph._add_movie(movie_id, movie["title"], movie["year"])
+        # The dicts already group edges by person and by movie
+        graph.person_offsets, graph.person_movies = _grouped(
+            (person["movies"] for person in people.values()), graph.movie_index)
+        graph.movie_offsets, graph.movie_people = _grouped(
+            (movie["stars"] for movie in movies.values()), graph.person_index)
+        return graph
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Build a compact graph straight from the CSV files in `directory`,
+        without materialising the `people` and `movies` dicts.
+        """
+        graph = cls()
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                graph._add_person(row["id"], row["name"], row["birth"])
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                graph._add_movie(row["id"], row["title"], row["year"])
+
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = graph.person_index.get(row["person_id"])
+                movie = graph.movie_index.get(row["movie_id"])
+                # Skip star rows pointing at unknown people or movies
+                if person is not None and movie is not None:
+                    edges.add((person, movie))
+        graph._build_adjacency(edges)
+        return graph
+
+    def __getstate__(self):
+        # The id -> dense index maps are rebuilt on unpickling
+        state = dict(self.__dict__)
+        del state["person_index"], state["movie_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.person_index = {person_id: person for person, person_id in enumerate(self.person_ids)}
+        self.movie_index = {movie_id: movie for movie, movie_id in enumerate(self.movie_ids)}
+
+    def _add_person(self, person_id, name, birth):
+        self.person_index[person_id] = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+
+    def _add_movie(self, movie_id, title, year):
+        self.movie_index[movie_id] = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+
+    def _build_adjacency(self, edges):
+        """
+        Fill both CSR structures from (person, movie) integer pairs.
+        """
+        edge_people = array("i")
+        edge_movies = array("i")
+        for person, movie in edges:
+            edge_people.append(person)
+            edge_movies.append(movie)
+        self.person_offsets, self.person_movies = _csr(
+            len(self.person_ids), edge_people, edge_movies)
+        self.movie_offsets, self.movie_people = _csr(
+            len(self.movie_ids), edge_movies, edge_people)
+
+    def movies_of(self, person):
+        """
+        Returns the dense movie ids of a dense person id.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the dense person ids of a dense movie id.
+        """
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(self.person_index[person_id]):
+            movie_id = self.movie_ids[movie]
+            for person in self.stars_of(movie):
+                neighbors.add((movie_id, self.person_ids[person]))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if source == target:
+            return []
+
+        # Parent person and via-movie per dense person id, -1 if unseen
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        # A movie's stars all join the frontier the first time it is reached
+        seen_movies = bytearray(len(self.movie_ids))
+        parent_person[source] = source
+
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            for movie in self.movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in self.stars_of(movie):
+                    if parent_person[star] != -1:
+                        continue
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+                    if star == target:
+                        return self._path(target, source, parent_person, parent_movie)
+                    frontier.append(star)
+        return None
+
+    def _path(self, target, source, parent_person, parent_movie):
+        """
+        Walks the parent arrays back from `target` to `source`.
+        """
+        path = []
+        person = target
+        while person != source:
+            path.append((self.movie_ids[parent_movie[person]], self.person_ids[person]))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+
+def _csr(size, rows, columns):
+    """
+    Returns (offsets, targets) arrays grouping `columns` by `rows`.
+    """
+    offsets = array("q", [0]) * (size + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    targets = array("i", [0]) * len(columns)
+    cursor = array("q", offsets[:-1])
+    for row, column in zip(rows, columns):
+        targets[cursor[row]] = column
+        cursor[row] += 1
+    return offsets, targets
+
+
+def _grouped(groups, index):
+    """
+    Returns (offsets, targets) arrays with one row per group of ids,
+    mapped to dense integers through `index`.
+    """
+    offsets = [0]
+    targets = []
+    for group in groups:
+        targets.extend(map(index.__getitem__, group))
+        offsets.append(len(targets))
+    return array("q", offsets), array("i", targets)
@@ -0,0 +1,228 @@
+import heapq
+from array import array
+from collections import deque
+
+import degrees
+from degrees import connected
+from graph import CompactGraph
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkOracle():
+    """
+    Landmark distance tables over a compact copy of the co-star graph.
+
+    Runs one BFS per landmark and keeps, for every person, their distance
+    to each landmark. The triangle inequality then gives lower and upper
+    bounds on any distance, and the lower bound drives an A* search (ALT).
+
+    The oracle answers for the data loaded when it was built; once people,
+    movies or stars are added or reloaded, its methods raise RuntimeError
+    and it must be rebuilt.
+    """
+
+    def __init__(self, landmarks=None, count=8, graph=None):
+        """
+        Uses the given landmark person_ids, or else `count` landmarks
+        spread out by `pick_landmarks`. `graph` is a CompactGraph of the
+        loaded data, built here if not given.
+        """
+        self.version = degrees.data_version
+        self.graph = graph if graph is not None else CompactGraph.from_data(degrees.people, degrees.movies)
+        if landmarks is None:
+            self.landmarks, self.distances = pick_landmarks(self.graph, count)
+        else:
+            self.landmarks = list(landmarks)
+            self.distances = [
+                bfs_distances(self.graph, self.graph.person_index[landmark])
+                for landmark in self.landmarks
+            ]
+
+        # Number of people expanded by the last call to shortest_path
+        self.expansions = 0
+
+    def _check_current(self):
+        if self.version != degrees.data_version:
+            raise RuntimeError("Landmark tables are stale, rebuild the LandmarkOracle")
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two people without searching. `upper` is None when no landmark
+        reaches them; both are None when the landmarks prove the pair is
+        not connected.
+        """
+        self._check_current()
+        s = self.graph.person_index[source]
+        t = self.graph.person_index[target]
+        lower = 0
+        upper = None
+        for distances in self.distances:
+            ds, dt = distances[s], distances[t]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                return None, None
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, searching with A*
+        guided by the landmark lower bounds.
+
+        If no possible path, returns None.
+        """
+        self._check_current()
+        self.expansions = 0
+        if source == target:
+            return []
+        if not connected(source, target):
+            return None
+
+        graph = self.graph
+        s = graph.person_index[source]
+        t = graph.person_index[target]
+        # Landmarks reaching the target, with the target's distance to each
+        columns = [(distances, distances[t]) for distances in self.distances if distances[t] != UNREACHABLE]
+
+        # Maps dense person to depth, (parent, movie) and landmark lower bound
+        depth = {s: 0}
+        parents = {s: None}
+        estimates = {s: _lower_bound(columns, s), t: 0}
+        # Maps dense movie to the depth its stars were last reached at through it
+        movie_depth = {}
+        closed = set()
+        # Bucket queue of people by (estimate, -depth): among equal
+        # estimates deeper people are closer to the target, and within a
+        # bucket people reached first go first as in BFS
+        buckets = {(estimates[s], 0): deque([s])}
+        keys = [(estimates[s], 0)]
+        while keys:
+            key = keys[0]
+            bucket = buckets[key]
+            person = bucket.popleft()
+            if not bucket:
+                heapq.heappop(keys)
+                del buckets[key]
+            if person == t:
+                return _path(graph, parents, t)
+            if person in closed:
+                continue
+            closed.add(person)
+            self.expansions += 1
+
+            distance = depth[person] + 1
+            for movie in graph.movies_of(person):
+                if movie_depth.get(movie, UNREACHABLE) <= distance:
+                    continue
+                movie_depth[movie] = distance
+                for star in graph.stars_of(movie):
+                    if depth.get(star, UNREACHABLE) <= distance:
+                        continue
+                    depth[star] = distance
+                    parents[star] = (person, movie)
+                    # No open person can lead to a shorter path to the target
+                    if star == t and (not keys or keys[0][0] >= distance):
+                        return _path(graph, parents, t)
+                    estimate = estimates.get(star)
+                    if estimate is None:
+                        estimate = estimates[star] = _lower_bound(columns, star)
+                    key = (distance + estimate, -distance)
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        bucket = buckets[key] = deque()
+                        heapq.heappush(keys, key)
+                    bucket.append(star)
+        return None
+
+
+def _lower_bound(columns, person):
+    """
+    Returns the landmark lower bound on the distance from a dense person
+    other than the target to the target whose landmark distances are in
+    `columns`, which is at least 1.
+    """
+    bound = 1
+    for distances, target_distance in columns:
+        distance = distances[person]
+        if distance != UNREACHABLE and abs(distance - target_distance) > bound:
+            bound = abs(distance - target_distance)
+    return bound
+
+
+def _path(graph, parents, target):
+    """
+    Walks dense (parent, movie) records back from `target` to the root.
+    """
+    path = []
+    person = target
+    while parents[person] is not None:
+        parent, movie = parents[person]
+        path.append((graph.movie_ids[movie], graph.person_ids[person]))
+        person = parent
+    path.reverse()
+    return path
+
+
+def bfs_distances(graph, source):
+    """
+    Returns an array of BFS distances from dense person `source` to every
+    person of `graph`, UNREACHABLE for other components.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        distance = distances[person] + 1
+        for movie in graph.movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_of(movie):
+                if distances[star] == UNREACHABLE:
+                    distances[star] = distance
+                    frontier.append(star)
+    return distances
+
+
+def pick_landmarks(graph, count):
+    """
+    Returns `count` landmark person_ids and their distance arrays, chosen
+    by farthest-point selection in the component of the person with the
+    most movies: each landmark is the person farthest from the landmarks
+    picked before it, so their bounds complement each other.
+    """
+    if not graph.person_ids or count <= 0:
+        return [], []
+    offsets = graph.person_offsets
+    seed = max(range(len(graph.person_ids)), key=lambda person: offsets[person + 1] - offsets[person])
+
+    # Distance of every person to the nearest landmark picked so far
+    nearest = bfs_distances(graph, seed)
+    landmarks = []
+    tables = []
+    for _ in range(count):
+        landmark = max(
+            (person for person, distance in enumerate(nearest) if distance != UNREACHABLE),
+            key=nearest.__getitem__,
+        )
+        if landmarks and nearest[landmark] == 0:
+            break
+        distances = bfs_distances(graph, landmark)
+        landmarks.append(graph.person_ids[landmark])
+        tables.append(distances)
+        if len(landmarks) == 1:
+            nearest = array("H", distances)
+        else:
+            for person, distance in enumerate(distances):
+                if distance < nearest[person]:
+                    nearest[person] = distance
+    return landmarks, tables
@@ -0,0 +1,134 @@
+import csv
+import itertools
+import json
+import resource
+import sys
+import time
+
+import degrees
+
+# Number of CSV rows handled per chunk
+CHUNK_SIZE = 65536
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python loader.py directory")
+    stats = stream_load_data(sys.argv[1])
+    print(json.dumps(stats, indent=2))
+
+
+def stream_load_data(directory, chunk_size=CHUNK_SIZE):
+    """
+    Load data from CSV files into `degrees.names`, `degrees.people` and
+    `degrees.movies`, reading rows in chunks and interning repeated strings.
+
+    Returns a dict of load statistics: rows and rows/sec per file, star
+    rows that point at unknown people or movies, and the peak resident set
+    size of the process so far, which is the load's own when it runs in a
+    fresh process as `python loader.py` does.
+    """
+    degrees.clear_indexes()
+    start = time.perf_counter()
+    stats = {
+        "people.csv": _timed(_load_people, directory, chunk_size),
+        "movies.csv": _timed(_load_movies, directory, chunk_size),
+        "stars.csv": _timed(_load_stars, directory, chunk_size),
+    }
+    stats["seconds"] = time.perf_counter() - start
+    stats["peak_rss_mb"] = _peak_rss_mb()
+    return stats
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed(load, directory, chunk_size):
+    """
+    Runs a loader and returns its statistics with timing added.
+    """
+    start = time.perf_counter()
+    stats = load(directory, chunk_size)
+    seconds = time.perf_counter() - start
+    stats["seconds"] = seconds
+    stats["rows_per_sec"] = stats["rows"] / seconds if seconds else None
+    return stats
+
+
+def _chunks(f, chunk_size):
+    """
+    Yields (header, rows) where rows are lists of at most `chunk_size` CSV rows.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    while True:
+        rows = list(itertools.islice(reader, chunk_size))
+        if not rows:
+            return
+        yield header, rows
+
+
+def _load_people(directory, chunk_size):
+    rows = 0
+    with open(f"{directory}/people.csv", encoding="utf-8", newline="") as f:
+        for header, chunk in _chunks(f, chunk_size):
+            id_col, name_col, birth_col = (header.index(key) for key in ("id", "name", "birth"))
+            for row in chunk:
+                person_id = sys.intern(row[id_col])
+                name = row[name_col]
+                degrees.people[person_id] = {
+                    "name": name,
+                    "birth": sys.intern(row[birth_col]),
+                    "movies": set(),
+                }
+                key = name.lower()
+                if key not in degrees.names:
+                    degrees.names[key] = {person_id}
+                else:
+                    degrees.names[key].add(person_id)
+            rows += len(chunk)
+    return {"rows": rows}
+
+
+def _load_movies(directory, chunk_size):
+    rows = 0
+    with open(f"{directory}/movies.csv", encoding="utf-8", newline="") as f:
+        for header, chunk in _chunks(f, chunk_size):
+            id_col, title_col, year_col = (header.index(key) for key in ("id", "title", "year"))
+            for row in chunk:
+                degrees.movies[sys.intern(row[id_col])] = {
+                    "title": row[title_col],
+                    "year": sys.intern(row[year_col]),
+                    "stars": set(),
+                }
+            rows += len(chunk)
+    return {"rows": rows}
+
+
+def _load_stars(directory, chunk_size):
+    rows = 0
+    dangling = 0
+    with open(f"{directory}/stars.csv", encoding="utf-8", newline="") as f:
+        for header, chunk in _chunks(f, chunk_size):
+            person_col, movie_col = header.index("person_id"), header.index("movie_id")
+            for row in chunk:
+                # Interning makes these share the id strings already used as keys
+                person_id = sys.intern(row[person_col])
+                movie_id = sys.intern(row[movie_col])
+                person = degrees.people.get(person_id)
+                movie = degrees.movies.get(movie_id)
+                if person is None or movie is None:
+                    dangling += 1
+                    continue
+                person["movies"].add(movie_id)
+                movie["stars"].add(person_id)
+            rows += len(chunk)
+    return {"rows": rows, "dangling": dangling}
+
+
+if __name__ == "__main__":
+    main()
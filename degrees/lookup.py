@@ -0,0 +1,215 @@
+import bisect
+import math
+from array import array
+from collections import Counter
+
+import degrees
+
+# Posting lists holding more than 1 in this many names of their group are
+# kept as bitmasks, at most four times the size of the array
+BITMASK_SPARSITY = 128
+
+
+class NameIndex():
+    """
+    Prefix and trigram indexes over the lowercase names in `degrees.names`,
+    for autocomplete, typo-tolerant lookup and non-interactive
+    disambiguation of people sharing a name.
+    """
+
+    def __init__(self):
+        # Sorted lowercase names, for prefix search with bisect
+        self.keys = sorted(degrees.names)
+        # Maps a trigram count to the positions in `keys` of names with
+        # that many distinct trigrams, the name's index within its group
+        self.groups = {}
+        # Maps (trigram count, trigram) to the indexes within that group of
+        # the names containing the trigram: an array, or a bitmask int
+        # where the list is dense
+        self.postings = {}
+        for position, key in enumerate(self.keys):
+            key_trigrams = trigrams(key)
+            group = self.groups.setdefault(len(key_trigrams), array("i"))
+            for trigram in key_trigrams:
+                self.postings.setdefault((len(key_trigrams), trigram), array("i")).append(len(group))
+            group.append(position)
+        for (size, trigram), posting in self.postings.items():
+            if len(posting) * BITMASK_SPARSITY > len(self.groups[size]):
+                self.postings[size, trigram] = _bitmask(posting, len(self.groups[size]))
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to `limit` person_ids whose name starts with `prefix`,
+        in name order.
+        """
+        prefix = prefix.lower()
+        person_ids = []
+        position = bisect.bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(person_ids) < limit:
+            key = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            person_ids.extend(self.rank(degrees.names[key]))
+            position += 1
+        return person_ids[:limit]
+
+    def search(self, text, limit=10, threshold=0.5):
+        """
+        Returns up to `limit` (score, name) pairs for names whose trigram
+        Dice similarity to `text` is at least `threshold`, best first.
+        """
+        query = trigrams(text.lower())
+        if not query:
+            return []
+        matches = self.similar(query, threshold)
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches[:limit]
+
+    def similar(self, query, threshold):
+        """
+        Returns (score, name) pairs for every name whose trigram Dice
+        similarity to the trigram set `query` is at least `threshold`.
+
+        Only names with a trigram count that could reach the threshold
+        are looked at. Within each such group, shared trigrams are counted
+        per name when all the postings are arrays, and otherwise in
+        bit-sliced counters over bitmasks, so that only names reaching
+        the threshold are visited one by one.
+        """
+        matches = []
+        count = len(query)
+        smallest = max(1, math.ceil(threshold * count / (2 - threshold)))
+        largest = math.floor((2 - threshold) * count / threshold)
+        for size in range(smallest, largest + 1):
+            group = self.groups.get(size)
+            needed = math.ceil(threshold * (count + size) / 2)
+            if group is None or needed > min(count, size):
+                continue
+
+            postings = [self.postings[size, trigram] for trigram in query if (size, trigram) in self.postings]
+            if not any(isinstance(posting, int) for posting in postings):
+                hits = Counter()
+                for posting in postings:
+                    hits.update(posting)
+                for index, shared in hits.items():
+                    if shared >= needed:
+                        matches.append((2 * shared / (count + size), self.keys[group[index]]))
+                continue
+
+            # Binary digits of each name's count of shared trigrams
+            planes = []
+            for posting in postings:
+                if not isinstance(posting, int):
+                    posting = _bitmask(posting, len(group))
+                _add_bitmask(planes, posting)
+            found = _at_least(planes, needed, (1 << len(group)) - 1)
+            if found:
+                length = (len(group) + 7) // 8
+                digits = [plane.to_bytes(length, "little") for plane in planes]
+                for index in _bits(found):
+                    shared = _digits_at(digits, index)
+                    matches.append((2 * shared / (count + size), self.keys[group[index]]))
+        return matches
+
+    def candidates(self, name, birth=None):
+        """
+        Returns the person_ids named exactly `name`, or else those with the
+        most similar names, ranked by birth year (see `rank`).
+        """
+        person_ids = degrees.names.get(name.lower())
+        if person_ids:
+            return self.rank(person_ids, birth)
+        ranked = []
+        for _, key in self.search(name):
+            ranked.extend(self.rank(degrees.names[key], birth))
+        return ranked
+
+    def resolve(self, name, birth=None):
+        """
+        Returns the best candidate person_id for `name`, or None.
+        """
+        ranked = self.candidates(name, birth)
+        return ranked[0] if ranked else None
+
+    def rank(self, person_ids, birth=None):
+        """
+        Orders person_ids by closeness of their birth year to `birth`, or
+        by birth year when no `birth` is given. Unknown births go last.
+        """
+        def key(person_id):
+            year = degrees.people[person_id]["birth"]
+            if not year.isdigit():
+                return (1, 0, person_id)
+            if birth is None:
+                return (0, int(year), person_id)
+            return (0, abs(int(year) - int(birth)), person_id)
+        return sorted(person_ids, key=key)
+
+
+def trigrams(text):
+    """
+    Returns the set of padded character trigrams of `text`.
+    """
+    padded = f"  {text} "
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _bitmask(indexes, size):
+    """
+    Returns an int with the bits at `indexes` set, for indexes below `size`.
+    """
+    data = bytearray((size + 7) // 8)
+    for index in indexes:
+        data[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(data, "little")
+
+
+def _add_bitmask(planes, mask):
+    """
+    Adds one to the bit-sliced counters in `planes` at every bit set in `mask`.
+    """
+    carry = mask
+    for digit, plane in enumerate(planes):
+        planes[digit] = plane ^ carry
+        carry &= plane
+        if not carry:
+            return
+    planes.append(carry)
+
+
+def _at_least(planes, value, full):
+    """
+    Returns a bitmask of the counters in `planes` that are at least `value`,
+    where `full` has a bit set for every counter.
+    """
+    if value >= 1 << len(planes):
+        return 0
+    greater = 0
+    equal = full
+    for digit in reversed(range(len(planes))):
+        if value >> digit & 1:
+            equal &= planes[digit]
+        else:
+            greater |= equal & planes[digit]
+            equal &= ~planes[digit]
+    return greater | equal
+
+
+def _digits_at(digits, index):
+    """
+    Returns the counter at `index` from bit-sliced planes given as bytes.
+    """
+    value = 0
+    for digit, data in enumerate(digits):
+        value |= (data[index >> 3] >> (index & 7) & 1) << digit
+    return value
+
+
+def _bits(mask):
+    """
+    Yields the indexes of the bits set in `mask`, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
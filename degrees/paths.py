@@ -0,0 +1,155 @@
+import heapq
+import itertools
+
+import degrees
+from degrees import connected
+
+
+class ShortestPathDAG():
+    """
+    Every shortest connection between two people, kept as the layered
+    DAG of a single BFS: each person on some shortest path records all
+    (person_id, movie_id) pairs that reach them from the previous layer.
+    """
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        # Maps person_id to its BFS depth from the source
+        self.depth = {source: 0}
+        # Maps person_id to a list of (parent person_id, movie_id) pairs
+        self.preds = {source: []}
+        # People in BFS order, so parents always come before children
+        self.order = [source]
+        self.length = None
+
+        if source == target:
+            self.length = 0
+        elif connected(source, target):
+            self._build()
+            self._prune()
+
+    def _build(self):
+        """
+        Expands whole BFS layers until the one containing the target is complete.
+        """
+        layer = [self.source]
+        distance = 0
+        while layer and self.target not in self.depth:
+            distance += 1
+            next_layer = []
+            for person_id in layer:
+                for movie_id in degrees.people[person_id]["movies"]:
+                    for star_id in degrees.movies[movie_id]["stars"]:
+                        depth = self.depth.get(star_id)
+                        if depth is None:
+                            self.depth[star_id] = distance
+                            self.preds[star_id] = []
+                            next_layer.append(star_id)
+                            depth = distance
+                        if depth == distance:
+                            self.preds[star_id].append((person_id, movie_id))
+            self.order.extend(next_layer)
+            layer = next_layer
+        if self.target in self.depth:
+            self.length = distance
+
+    def _prune(self):
+        """
+        Drops people that do not lie on a shortest path to the target.
+        """
+        if self.length is None:
+            self.preds = {}
+            self.order = []
+            return
+        keep = {self.target}
+        for person_id in reversed(self.order):
+            if person_id in keep:
+                keep.update(parent_id for parent_id, _ in self.preds[person_id])
+        self.order = [person_id for person_id in self.order if person_id in keep]
+        self.preds = {person_id: self.preds[person_id] for person_id in self.order}
+
+    def count(self):
+        """
+        Returns the number of distinct shortest connections.
+        """
+        if self.length is None:
+            return 0
+        ways = {self.source: 1}
+        for person_id in self.order[1:]:
+            ways[person_id] = sum(ways[parent_id] for parent_id, _ in self.preds[person_id])
+        return ways[self.target]
+
+    def all_paths(self):
+        """
+        Lazily yields every shortest list of (movie_id, person_id) pairs
+        from the source to the target.
+        """
+        if self.length is None:
+            return
+        stack = [(self.target, ())]
+        while stack:
+            person_id, suffix = stack.pop()
+            if person_id == self.source:
+                yield list(suffix)
+                continue
+            for parent_id, movie_id in reversed(self.preds[person_id]):
+                stack.append((parent_id, ((movie_id, person_id),) + suffix))
+
+    def best_paths(self, weight, k=None):
+        """
+        Lazily yields shortest paths in decreasing order of the summed
+        `weight(movie_id)` of their movies, at most `k` of them.
+        """
+        if self.length is None:
+            return iter(())
+        return itertools.islice(self._best_paths(weight), k)
+
+    def _best_paths(self, weight):
+        # Best achievable weight from the source to each person
+        best = {self.source: 0}
+        for person_id in self.order[1:]:
+            best[person_id] = max(
+                best[parent_id] + weight(movie_id)
+                for parent_id, movie_id in self.preds[person_id]
+            )
+
+        counter = itertools.count()
+        heap = [(-best[self.target], next(counter), 0, self.target, ())]
+        while heap:
+            _, _, partial, person_id, suffix = heapq.heappop(heap)
+            if person_id == self.source:
+                yield list(suffix)
+                continue
+            for parent_id, movie_id in self.preds[person_id]:
+                gained = partial + weight(movie_id)
+                heapq.heappush(heap, (
+                    -(gained + best[parent_id]), next(counter),
+                    gained, parent_id, ((movie_id, person_id),) + suffix,
+                ))
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest connection between two people.
+    """
+    return ShortestPathDAG(source, target).all_paths()
+
+
+def k_shortest_paths(source, target, k, prefer_recent=False):
+    """
+    Returns up to `k` shortest connections between two people, those
+    through the most recent movies first if `prefer_recent` is set.
+    """
+    dag = ShortestPathDAG(source, target)
+    if prefer_recent:
+        return list(dag.best_paths(movie_year, k))
+    return list(itertools.islice(dag.all_paths(), k))
+
+
+def movie_year(movie_id):
+    """
+    Returns the year of a movie as an int, or 0 if it is unknown.
+    """
+    year = degrees.movies[movie_id]["year"]
+    return int(year) if year.isdigit() else 0
@@ -0,0 +1,211 @@
+import json
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+
+from degrees import load_data, load_delta, bfs_tree, path_from_tree, bidirectional_shortest_path
+from batch import resolve_person
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python server.py directory [port]")
+    directory = sys.argv[1]
+
+    print("Loading data...", file=sys.stderr)
+    load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    server = QueryServer()
+    if len(sys.argv) == 3:
+        serve_socket(server, int(sys.argv[2]))
+    else:
+        serve_lines(server, sys.stdin, sys.stdout)
+
+
+class QueryServer():
+    """
+    Answers shortest path queries against the loaded data, caching
+    recent results and the BFS trees of sources asked about repeatedly.
+
+    Trees stop growing at `tree_size` people, so building one costs about
+    as much as a few searches; targets outside a source's tree are found
+    with a bidirectional search instead. Requests may come from several
+    threads, and are answered one at a time.
+    """
+
+    def __init__(self, result_cache_size=10000, tree_cache_size=16, tree_size=20000):
+        self.result_cache_size = result_cache_size
+        self.tree_cache_size = tree_cache_size
+        self.tree_size = tree_size
+        self.lock = threading.Lock()
+
+        # Maps (source_id, target_id) to a path
+        self.results = OrderedDict()
+        # Maps source_id to a bfs_tree of at most `tree_size` people
+        self.trees = OrderedDict()
+        # Sources seen once, whose tree is built on the next query
+        self.recent_sources = OrderedDict()
+
+        self.stats = {
+            "queries": 0,
+            "result_hits": 0,
+            "result_misses": 0,
+            "tree_hits": 0,
+            "tree_misses": 0,
+        }
+
+    def handle(self, request):
+        """
+        Returns the response dict for a request dict.
+        """
+        with self.lock:
+            return self._handle(request)
+
+    def _handle(self, request):
+        op = request.get("op", "path")
+        if op == "stats":
+            return self.counters()
+        if op == "delta":
+            return self.apply_delta(request.get("directory"))
+        if op != "path":
+            return {"error": f"Unknown op {op!r}."}
+
+        source = request.get("source")
+        target = request.get("target")
+        response = {"source": source, "target": target}
+        source_id = resolve_person(str(source))
+        target_id = resolve_person(str(target))
+        if source_id is None or target_id is None:
+            response["error"] = "Person not found."
+            return response
+
+        path = self.shortest_path(source_id, target_id)
+        response["degrees"] = None if path is None else len(path)
+        response["path"] = path
+        return response
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest path between two person_ids, from cache if possible.
+        """
+        self.stats["queries"] += 1
+        key = (source, target)
+        if key in self.results:
+            self.stats["result_hits"] += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        self.stats["result_misses"] += 1
+
+        parents = self.tree(source)
+        # A tree smaller than `tree_size` holds the whole component
+        if parents is not None and (target in parents or len(parents) < self.tree_size):
+            path = path_from_tree(parents, target)
+        else:
+            path = bidirectional_shortest_path(source, target)
+
+        self.results[key] = path
+        if len(self.results) > self.result_cache_size:
+            self.results.popitem(last=False)
+        return path
+
+    def tree(self, source):
+        """
+        Returns the cached BFS tree of `source`, building it if the source
+        was queried recently, or None for a first-time source. The tree
+        covers at most the `tree_size` people nearest to `source`.
+        """
+        if source in self.trees:
+            self.stats["tree_hits"] += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+        self.stats["tree_misses"] += 1
+
+        if source not in self.recent_sources:
+            self.recent_sources[source] = True
+            if len(self.recent_sources) > self.result_cache_size:
+                self.recent_sources.popitem(last=False)
+            return None
+
+        del self.recent_sources[source]
+        parents = bfs_tree(source, max_people=self.tree_size)
+        self.trees[source] = parents
+        if len(self.trees) > self.tree_cache_size:
+            self.trees.popitem(last=False)
+        return parents
+
+    def apply_delta(self, directory):
+        """
+        Appends the delta CSVs in `directory` and drops cached answers,
+        which may have been shortened by the new edges.
+        """
+        if not isinstance(directory, str) or not directory:
+            return {"error": "Missing directory."}
+        try:
+            counts = load_delta(directory)
+        except (KeyError, OSError, TypeError, ValueError) as error:
+            return {"error": f"Could not apply delta: {error}"}
+        self.results.clear()
+        self.trees.clear()
+        return counts
+
+    def counters(self):
+        """
+        Returns the hit/miss counters and cache sizes.
+        """
+        counters = dict(self.stats)
+        counters["cached_results"] = len(self.results)
+        counters["cached_trees"] = len(self.trees)
+        return counters
+
+
+def serve_lines(server, lines, out):
+    """
+    Answers one JSON request per line of `lines`, writing JSON lines to `out`.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            response = server.handle(json.loads(line))
+        except (ValueError, AttributeError):
+            response = {"error": "Invalid request."}
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+
+def serve_socket(server, port):
+    """
+    Serves the same JSON lines protocol on a localhost TCP port, with a
+    thread per connection so an idle client does not hold up the others.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode("utf-8") for line in self.rfile)
+            serve_lines(server, lines, _SocketWriter(self.wfile))
+
+    with _ThreadingServer(("127.0.0.1", port), Handler) as tcp_server:
+        print(f"Listening on 127.0.0.1:{port}", file=sys.stderr)
+        tcp_server.serve_forever()
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    # Connection threads do not keep the process alive on shutdown
+    daemon_threads = True
+
+
+class _SocketWriter():
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode("utf-8"))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import csv
+import itertools
+import os
+import random
+import sys
+
+FIRST_NAMES = [
+    "Ada", "Ben", "Cara", "Dan", "Eve", "Finn", "Gia", "Hal", "Ivy", "Jon",
+    "Kim", "Leo", "Mia", "Ned", "Ola", "Pia", "Quin", "Rex", "Sam", "Tia",
+]
+LAST_NAMES = [
+    "Abbott", "Baker", "Chen", "Diaz", "Evans", "Fox", "Gray", "Hill",
+    "Ito", "Jones", "Khan", "Lee", "Moss", "Nash", "Ortiz", "Park",
+    "Quinn", "Reyes", "Shaw", "Tran", "Usman", "Vega", "Wolfe", "Young",
+]
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python synthetic.py directory stars [seed]")
+    directory = sys.argv[1]
+    stars = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+    counts = generate(directory, stars, seed)
+    print(f"Wrote {counts['people']} people, {counts['movies']} movies "
+          f"and {counts['stars']} stars to {directory}")
+
+
+def generate(directory, stars, seed=0, alpha=1.5):
+    """
+    Write synthetic people.csv, movies.csv and stars.csv to `directory`
+    with about `stars` star rows.
+
+    Cast sizes follow a Pareto distribution with shape `alpha`, and people
+    are cast with Zipf-like popularity, so a few hub actors appear in many
+    movies, as in the IMDB data. Returns the number of rows written per file.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    person_count = max(2, stars // 4)
+
+    # Zipf-like weights 1/rank, shuffled so hubs get arbitrary ids
+    ranks = list(range(1, person_count + 1))
+    rng.shuffle(ranks)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in ranks))
+    person_ids = [str(i + 1) for i in range(person_count)]
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person_id in person_ids:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            writer.writerow([person_id, name, rng.randint(1920, 2005)])
+
+    written = 0
+    movie_count = 0
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as movies_file, \
+            open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as stars_file:
+        movies_writer = csv.writer(movies_file)
+        stars_writer = csv.writer(stars_file)
+        movies_writer.writerow(["id", "title", "year"])
+        stars_writer.writerow(["person_id", "movie_id"])
+        while written < stars:
+            movie_count += 1
+            movie_id = str(movie_count)
+            movies_writer.writerow([movie_id, f"Movie {movie_count}", rng.randint(1930, 2025)])
+
+            cast_size = min(stars - written, person_count, int(rng.paretovariate(alpha)) + 1)
+            cast = set(rng.choices(person_ids, cum_weights=cum_weights, k=cast_size))
+            for person_id in cast:
+                stars_writer.writerow([person_id, movie_id])
+            written += len(cast)
+
+    return {"people": person_count, "movies": movie_count, "stars": written}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,35 @@
 import os
+import pickle
 import random
 import re
 import sys
+import time
 import copy
+from concurrent.futures import ProcessPoolExecutor
 
 DAMPING = 0.85
 SAMPLES = 10000
+# Solvers accepted by power_iteration
+SOLVERS = ("power", "gauss_seidel", "quadratic")
+
+LINK_PATTERN = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+# Characters read per chunk when streaming a page, and the longest anchor tag
+# that may straddle two chunks
+CHUNK_SIZE = 1 << 16
+MAX_TAG = 4096
+
+# Parsed links of every page, kept in the corpus directory between runs
+LINK_CACHE = ".linkcache.pickle"
+
+# Corpus, PageRank values, damping factor and tolerance of the last
+# `refresh_pagerank` run
+RANKS_CACHE = ".ranks.pickle"
 
 
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    corpus = cached_crawl(sys.argv[1])
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
@@ -49,6 +67,127 @@ def crawl(directory):
     return pages
 
 
+def parallel_crawl(directory, workers=None):
+    """
+    Parse a directory of HTML pages across a pool of `workers` processes,
+    streaming each file in chunks through an incremental link extractor.
+
+    Return the link graph as (pages, offsets, links), in the same CSR
+    form as `link_graph`, built directly from the parsed links.
+    """
+    import numpy as np
+
+    pages = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    links = []
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (8 * workers))
+    with ProcessPoolExecutor(workers) as executor:
+        for i, found in enumerate(executor.map(extract_links, paths, chunksize=chunksize)):
+            # Only keep links to other pages in the corpus
+            targets = sorted(set(index[link] for link in found if link in index) - {i})
+            links.extend(targets)
+            offsets[i + 1] = offsets[i] + len(targets)
+    return pages, offsets, np.array(links, dtype=np.int64)
+
+
+def extract_links(path):
+    """
+    Return the set of link targets in the HTML file at `path`, reading
+    it in chunks so memory use does not grow with the file size.
+    """
+    links = set()
+    tail = ""
+    with open(path) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            text = tail + chunk
+            end = 0
+            for match in LINK_PATTERN.finditer(text):
+                links.add(match.group(1))
+                end = match.end()
+            # Keep a possibly unfinished tag for the next chunk
+            tail = text[max(end, len(text) - MAX_TAG):]
+    return links
+
+
+def cached_crawl(directory, stats=None, workers=None):
+    """
+    Like `crawl`, but only re-parses pages added or changed since the
+    last run, using a cache of each page's links keyed by its size and
+    modification time. Pages deleted since are dropped from the cache.
+
+    If `stats` is a dictionary, it is filled with the number of pages
+    added, changed, deleted and reused.
+    """
+    cache_path = os.path.join(directory, LINK_CACHE)
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        cache = {}
+
+    counts = {"added": 0, "changed": 0, "deleted": 0, "reused": 0}
+    entries = {}
+    stale = []
+    for filename in os.listdir(directory):
+        if not filename.endswith(".html"):
+            continue
+        stat = os.stat(os.path.join(directory, filename))
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = cache.get(filename)
+        if cached is not None and cached[0] == key:
+            entries[filename] = cached
+            counts["reused"] += 1
+        else:
+            stale.append((filename, key))
+            counts["changed" if cached is not None else "added"] += 1
+    counts["deleted"] = len(set(cache) - set(entries) - set(name for name, _ in stale))
+
+    paths = [os.path.join(directory, filename) for filename, _ in stale]
+    if len(paths) > 64:
+        with ProcessPoolExecutor(workers) as executor:
+            parsed = list(executor.map(extract_links, paths, chunksize=16))
+    else:
+        parsed = [extract_links(path) for path in paths]
+    for (filename, key), links in zip(stale, parsed):
+        entries[filename] = (key, links)
+
+    if stale or counts["deleted"]:
+        try:
+            with open(cache_path + ".tmp", "wb") as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass
+
+    if stats is not None:
+        stats.update(counts)
+    # Only include links to other pages in the corpus
+    return {
+        filename: set(link for link in links if link in entries) - {filename}
+        for filename, (_, links) in entries.items()
+    }
+
+
+def graph_corpus(pages, offsets, links):
+    """
+    Return the corpus dictionary described by a CSR link graph.
+    """
+    return {
+        page: set(pages[j] for j in links[offsets[i]:offsets[i + 1]])
+        for i, page in enumerate(pages)
+    }
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -69,35 +208,65 @@ def transition_model(corpus, page, damping_factor):
     return pdisribution
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, processes=None, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
 
+    If `processes` is given, the samples are split across that many
+    worker processes, each walking its own chain with an independent
+    random stream derived from `seed`, and their visit counts are merged.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    sample_cnt = {}
-    corpus_length = len(corpus)
+    # Precomputed link tuples make each step two O(1) random choices:
+    # teleport or follow a link
+    links = {page: tuple(sorted(corpus[page])) for page in sorted(corpus)}
+    if processes is None:
+        sample_cnt = _sample_counts(links, damping_factor, n, random)
+    else:
+        if seed is None:
+            seed = random.getrandbits(64)
+        shares = [n // processes + (i < n % processes) for i in range(processes)]
+        jobs = [(links, damping_factor, share, f"{seed}/{i}") for i, share in enumerate(shares)]
+        sample_cnt = dict.fromkeys(links, 0)
+        with ProcessPoolExecutor(processes) as executor:
+            for counts in executor.map(_sample_worker, jobs):
+                for page, count in counts.items():
+                    sample_cnt[page] += count
+
     for page in corpus:
-        sample_cnt[page] = 0
-    start_page = random.sample(sorted(corpus), 1)[0]
-    next_page = start_page
+        sample_cnt[page] /= n
+    return sample_cnt
+
+
+def _sample_worker(job):
+    links, damping_factor, n, stream = job
+    # String seeds are hashed with SHA-512, so streams do not overlap
+    return _sample_counts(links, damping_factor, n, random.Random(stream))
+
+
+def _sample_counts(links, damping_factor, n, rng):
+    """
+    Return how many of `n` steps of a random surfer fell on each page,
+    drawing from `rng` (the `random` module or a `random.Random`).
+    """
+    sample_cnt = dict.fromkeys(links, 0)
+    if n == 0:
+        return sample_cnt
+    pages = list(links)
+    next_page = rng.choice(pages)
     for i in range(n):
         current_page = next_page
         sample_cnt[current_page] += 1
-        # 加权随机选择算法（相当于运用几何概型）
-        rv = random.random()
-        weightsum = 0
-        tran_model = transition_model(corpus, current_page, damping_factor)
-        for page in tran_model:
-            weightsum += tran_model[page]
-            if weightsum > rv:
-                next_page = page
-                break
-    for page in corpus:
-        sample_cnt[page] /= n
+        page_links = links[current_page]
+        # Pages without links jump to a random page, like a teleport
+        if page_links and rng.random() < damping_factor:
+            next_page = rng.choice(page_links)
+        else:
+            next_page = rng.choice(pages)
     return sample_cnt
 
 
@@ -138,5 +307,458 @@ def iterate_pagerank(corpus, damping_factor):
     return current_pdistribution
 
 
+def link_graph(corpus):
+    """
+    Return an integer-indexed, compressed sparse row view of `corpus`.
+
+    Return a tuple (pages, offsets, links) where `pages` is the sorted
+    list of page names and the pages linked to by `pages[i]` are the
+    indexes `links[offsets[i]:offsets[i + 1]]` (NumPy arrays).
+    """
+    import numpy as np
+
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    links = []
+    for i, page in enumerate(pages):
+        targets = sorted(index[link] for link in corpus[page])
+        links.extend(targets)
+        offsets[i + 1] = offsets[i] + len(targets)
+    return pages, offsets, np.array(links, dtype=np.int64)
+
+
+def power_iteration(offsets, links, damping_factor, ranks=None,
+                    tolerance=1e-8, max_iterations=1000, method="power", log=None):
+    """
+    Return the PageRank vector of a CSR link graph and the number of
+    iterations it took, solving with `method`, one of `SOLVERS`:
+
+    "power": power iteration over the column-stochastic link matrix.
+    "gauss_seidel": block Gauss-Seidel sweeps that use each block's new
+    values for the blocks after it.
+    "quadratic": power iteration with quadratic extrapolation, kept
+    only when it lowers the residual.
+
+    Pages without links are treated as linking to every page. Iteration
+    starts from `ranks` (uniform if None) and stops once the L1 change
+    between iterations drops below `tolerance`. If `log` is a list, a
+    dict with the iteration, its L1 change ("residual") and the elapsed
+    seconds is appended to it after every iteration.
+    """
+    import numpy as np
+
+    if method not in SOLVERS:
+        raise ValueError(f"Unknown PageRank solver {method!r}")
+    matrix = _link_matrix(offsets, links)
+    n = matrix["size"]
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+    else:
+        ranks = np.asarray(ranks, dtype=np.float64) / np.sum(ranks)
+
+    if method == "power":
+        steps = _power_steps(matrix, ranks, damping_factor)
+    elif method == "gauss_seidel":
+        steps = _gauss_seidel_steps(matrix, ranks, damping_factor)
+    else:
+        steps = _extrapolated_steps(matrix, ranks, damping_factor)
+
+    iterations = 0
+    start = time.perf_counter()
+    while iterations < max_iterations:
+        # `complete` is False for steps that do not follow from the
+        # previous one, whose change does not show convergence
+        next_ranks, complete = next(steps)
+        iterations += 1
+        change = np.abs(next_ranks - ranks).sum()
+        ranks = next_ranks
+        if log is not None:
+            log.append({
+                "iteration": iterations,
+                "residual": float(change),
+                "seconds": time.perf_counter() - start,
+            })
+        if complete and change < tolerance:
+            break
+    return ranks, iterations
+
+
+def _link_matrix(offsets, links):
+    """
+    Return the arrays shared by the solvers: out-degrees, the source of
+    every link, and the links grouped by target page (in-link CSR).
+    """
+    import numpy as np
+
+    n = len(offsets) - 1
+    out_degree = np.diff(offsets)
+    dangling = out_degree == 0
+    inverse_degree = np.zeros(n)
+    inverse_degree[~dangling] = 1 / out_degree[~dangling]
+    # Source page of every link, so each step is a single weighted bincount
+    sources = np.repeat(np.arange(n), out_degree)
+
+    order = np.argsort(links, kind="stable")
+    in_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(links, minlength=n), out=in_offsets[1:])
+    return {
+        "size": n,
+        "links": links,
+        "sources": sources,
+        "dangling": dangling,
+        "inverse_degree": inverse_degree,
+        "in_offsets": in_offsets,
+        "in_sources": sources[order],
+        "in_targets": links[order],
+    }
+
+
+def _power_step(matrix, ranks, damping_factor):
+    import numpy as np
+
+    n = matrix["size"]
+    share = ranks * matrix["inverse_degree"]
+    spread = (1 - damping_factor + damping_factor * ranks[matrix["dangling"]].sum()) / n
+    inflow = np.bincount(matrix["links"], weights=share[matrix["sources"]], minlength=n)
+    return damping_factor * inflow + spread
+
+
+def _power_steps(matrix, ranks, damping_factor):
+    while True:
+        ranks = _power_step(matrix, ranks, damping_factor)
+        yield ranks, True
+
+
+def _gauss_seidel_steps(matrix, ranks, damping_factor, blocks=64):
+    import numpy as np
+
+    n = matrix["size"]
+    dangling = matrix["dangling"]
+    inverse_degree = matrix["inverse_degree"]
+    in_offsets = matrix["in_offsets"]
+    bounds = np.unique(np.linspace(0, n, min(blocks, n) + 1).astype(np.int64))
+    while True:
+        ranks = ranks.copy()
+        share = ranks * inverse_degree
+        dangling_mass = ranks[dangling].sum()
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            first, last = in_offsets[low], in_offsets[high]
+            inflow = np.bincount(
+                matrix["in_targets"][first:last] - low,
+                weights=share[matrix["in_sources"][first:last]],
+                minlength=high - low,
+            )
+            block = damping_factor * (inflow + dangling_mass / n) + (1 - damping_factor) / n
+            block_dangling = dangling[low:high]
+            dangling_mass += block[block_dangling].sum() - ranks[low:high][block_dangling].sum()
+            ranks[low:high] = block
+            share[low:high] = block * inverse_degree[low:high]
+        ranks /= ranks.sum()
+        yield ranks, True
+
+
+def _extrapolated_steps(matrix, ranks, damping_factor, period=10, attempts=2):
+    """
+    Power steps with quadratic extrapolation from the latest four
+    iterates, tried once their residuals have shrunk geometrically for
+    three steps and at least `period` steps after the last attempt.
+
+    The extrapolated vector costs one power step to check and is kept
+    only if its residual beats the one expected from the next plain step.
+    Otherwise iteration resumes from the last plain iterate, the wait
+    before the next attempt doubles, and after `attempts` rejections in
+    a row no further extrapolation is tried.
+    """
+    import numpy as np
+
+    history = [ranks]
+    residuals = []
+    wait = period
+    since = 0
+    rejected = 0
+    # Whether the last yield was computed from the `ranks` before it
+    trusted = True
+    while True:
+        next_ranks = _power_step(matrix, ranks, damping_factor)
+        residuals = residuals[-2:] + [np.abs(next_ranks - ranks).sum()]
+        history = history[-3:] + [next_ranks]
+        ranks = next_ranks
+        since += 1
+        yield ranks, trusted
+        trusted = True
+
+        if rejected == attempts or since < wait or len(history) < 4 or not _geometric(residuals):
+            continue
+        since = 0
+        rate = residuals[-1] / residuals[-2]
+        candidate = _quadratic(*history)
+        checked = _power_step(matrix, candidate, damping_factor)
+        # The change from the previous iterate is not a residual
+        yield checked, False
+        if np.abs(checked - candidate).sum() < rate * residuals[-1]:
+            ranks = checked
+            history = [checked]
+            residuals = []
+            wait = period
+            rejected = 0
+        else:
+            trusted = False
+            wait *= 2
+            rejected += 1
+
+
+def _geometric(residuals, spread=0.1):
+    """
+    Return whether three successive residuals shrink by nearly the same factor.
+    """
+    first, second = residuals[-2] / residuals[-3], residuals[-1] / residuals[-2]
+    return second < 1 and abs(second - first) <= spread * second
+
+
+def _quadratic(x0, x1, x2, x3):
+    """
+    Return the quadratic extrapolation (Kamvar et al.) of four iterates.
+    """
+    import numpy as np
+
+    y = np.column_stack((x1 - x0, x2 - x0))
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    gamma1, gamma2, gamma3 = gamma[0], gamma[1], 1.0
+    extrapolated = (gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2 + gamma3 * x3
+    if not np.all(np.isfinite(extrapolated)) or extrapolated.sum() <= 0:
+        return x3
+    extrapolated = np.where(extrapolated > 0, extrapolated, x3)
+    return extrapolated / extrapolated.sum()
+
+
+def matrix_pagerank(corpus, damping_factor, tolerance=1e-8, max_iterations=1000,
+                    method="power", log=None):
+    """
+    Return PageRank values for each page by iterating over a sparse
+    link matrix with the `method` solver (see `power_iteration`),
+    until the L1 change drops below `tolerance`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, offsets, links = link_graph(corpus)
+    ranks, _ = power_iteration(offsets, links, damping_factor, tolerance=tolerance,
+                               max_iterations=max_iterations, method=method, log=log)
+    return dict(zip(pages, ranks.tolist()))
+
+
+def corpus_delta(old_corpus, new_corpus):
+    """
+    Return a dictionary mapping every page that was added, removed or
+    whose links changed between two corpora to its new set of links,
+    or None for removed pages.
+    """
+    delta = {}
+    for page, links in new_corpus.items():
+        if old_corpus.get(page) != links:
+            delta[page] = links
+    for page in old_corpus:
+        if page not in new_corpus:
+            delta[page] = None
+    return delta
+
+
+def apply_corpus_delta(corpus, delta):
+    """
+    Return a new corpus with the changes of `delta` (see `corpus_delta`)
+    applied, dropping links to removed pages.
+    """
+    updated = dict(corpus)
+    for page, links in delta.items():
+        if links is None:
+            updated.pop(page, None)
+        else:
+            updated[page] = set(links)
+    removed = set(page for page, links in delta.items() if links is None)
+    if removed:
+        for page, links in updated.items():
+            if links & removed:
+                updated[page] = links - removed
+    return updated
+
+
+def incremental_pagerank(corpus, delta, ranks, damping_factor, push=False,
+                         tolerance=1e-8, max_iterations=1000, stats=None):
+    """
+    Return the updated corpus and its PageRank values after applying
+    `delta` to `corpus`, starting power iteration from the previous
+    `ranks` rather than from the uniform distribution.
+
+    With `push`, the error of the previous ranks is first pushed along
+    links out from the pages whose links changed and the pages they
+    linked to before or after, before the remaining iterations. If
+    `stats` is a dictionary, it is filled with the number of pushes,
+    push rounds and iterations.
+    """
+    import numpy as np
+
+    old_corpus = corpus
+    corpus = apply_corpus_delta(corpus, delta)
+    pages, offsets, links = link_graph(corpus)
+    start = np.array([ranks.get(page, 1 / len(pages)) for page in pages])
+    start /= start.sum()
+
+    pushes = rounds = 0
+    if push:
+        touched = set(delta)
+        # Removing pages also changes the links of pages linking to them
+        removed = set(page for page, page_links in delta.items() if page_links is None)
+        if removed:
+            touched.update(page for page, page_links in old_corpus.items() if page_links & removed)
+        seeds = set()
+        for page in touched:
+            seeds.add(page)
+            seeds.update(old_corpus.get(page, ()))
+            seeds.update(corpus.get(page, ()))
+        index = {page: i for i, page in enumerate(pages)}
+        seeds = np.array(sorted(index[page] for page in seeds if page in index), dtype=np.int64)
+        start, pushes, rounds = _push_residuals(offsets, links, start, damping_factor,
+                                                tolerance, seeds)
+    ranks, iterations = power_iteration(offsets, links, damping_factor, ranks=start,
+                                        tolerance=tolerance, max_iterations=max_iterations)
+    if stats is not None:
+        stats["pushes"] = pushes
+        stats["push_rounds"] = rounds
+        stats["iterations"] = iterations
+    return corpus, dict(zip(pages, ranks.tolist()))
+
+
+def _push_residuals(offsets, links, ranks, damping_factor, epsilon, seeds):
+    """
+    Return ranks corrected by pushing residuals larger than `epsilon`
+    along links, and the numbers of pushes and push rounds.
+
+    Each round pushes the residuals of a whole frontier of pages at once,
+    starting from the pages `seeds`; the next frontier is the pages they
+    link to, and the pages without links, whose residual has grown past
+    `epsilon`. Pages without links push to every page.
+    """
+    import numpy as np
+
+    n = len(ranks)
+    out_degree = np.diff(offsets)
+    dangling = out_degree == 0
+    sources = np.repeat(np.arange(n), out_degree)
+    share = np.zeros(n)
+    share[~dangling] = ranks[~dangling] / out_degree[~dangling]
+    inflow = np.bincount(links, weights=share[sources], minlength=n)
+    spread = (1 - damping_factor + damping_factor * ranks[dangling].sum()) / n
+    residual = damping_factor * inflow + spread - ranks
+
+    ranks = ranks.copy()
+    pushes = rounds = 0
+    frontier = seeds[np.abs(residual[seeds]) > epsilon]
+    while frontier.size:
+        amount = residual[frontier]
+        ranks[frontier] += amount
+        residual[frontier] = 0
+        pushes += frontier.size
+        rounds += 1
+
+        # Pages without links spread what they receive over every page
+        residual += damping_factor * amount[dangling[frontier]].sum() / n
+        counts = out_degree[frontier]
+        # Positions in `links` of every link out of the frontier
+        positions = np.repeat(offsets[frontier] - np.cumsum(counts) + counts, counts)
+        positions += np.arange(positions.size)
+        reached, inverse = np.unique(links[positions], return_inverse=True)
+        weights = np.repeat(damping_factor * amount / np.maximum(counts, 1), counts)
+        residual[reached] += np.bincount(inverse, weights=weights, minlength=reached.size)
+        frontier = np.union1d(reached[np.abs(residual[reached]) > epsilon],
+                              np.flatnonzero(dangling & (np.abs(residual) > epsilon)))
+    return ranks / ranks.sum(), pushes, rounds
+
+
+def refresh_pagerank(directory, damping_factor, push=True, tolerance=1e-8, stats=None):
+    """
+    Return PageRank values for the corpus in `directory`, warm-started
+    from the values saved by the previous call for that directory, and
+    save the new values for the next call.
+
+    The saved values are returned as they are only if the corpus is
+    unchanged and they were computed with the same `damping_factor` and
+    at least as tight a `tolerance`.
+    """
+    corpus = cached_crawl(directory)
+    cache_path = os.path.join(directory, RANKS_CACHE)
+    try:
+        with open(cache_path, "rb") as f:
+            old_corpus, old_ranks, old_damping, old_tolerance = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        old_corpus, old_ranks, old_damping, old_tolerance = {}, {}, None, None
+
+    delta = corpus_delta(old_corpus, corpus)
+    current = old_damping == damping_factor and old_tolerance <= tolerance
+    if old_ranks and not delta and current:
+        ranks = old_ranks
+    else:
+        _, ranks = incremental_pagerank(old_corpus, delta, old_ranks, damping_factor,
+                                        push=push and bool(old_ranks),
+                                        tolerance=tolerance, stats=stats)
+        try:
+            with open(cache_path + ".tmp", "wb") as f:
+                pickle.dump((corpus, ranks, damping_factor, tolerance), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass
+    return ranks
+
+
+def walker_pagerank(corpus, damping_factor, n, walkers=4096, seed=None,
+                    batches=32, burn_in=20):
+    """
+    Return PageRank estimates from `n` samples taken by `walkers` random
+    surfers advancing in lockstep over a CSR link graph, and the standard
+    error of each estimate.
+
+    Return a tuple of two dictionaries keyed by page name: the estimated
+    PageRank values, which sum to 1, and their standard errors, from the
+    spread of `batches` consecutive batch means. The first `burn_in` steps
+    are not counted. A fixed `seed` makes the run reproducible.
+    """
+    import numpy as np
+
+    pages, offsets, links = link_graph(corpus)
+    size = len(pages)
+    out_degree = np.diff(offsets)
+    rng = np.random.default_rng(seed)
+
+    steps = max(1, -(-n // walkers))
+    batches = max(1, min(batches, steps))
+    batch_counts = np.zeros((batches, size), dtype=np.int64)
+
+    positions = rng.integers(size, size=walkers)
+    for step in range(burn_in + steps):
+        if step >= burn_in:
+            batch = (step - burn_in) * batches // steps
+            batch_counts[batch] += np.bincount(positions, minlength=size)
+
+        degree = out_degree[positions]
+        follow = (rng.random(walkers) < damping_factor) & (degree > 0)
+        jump = rng.integers(size, size=walkers)
+        if len(links):
+            choice = offsets[positions] + (rng.random(walkers) * degree).astype(np.int64)
+            choice = np.minimum(choice, len(links) - 1)
+            positions = np.where(follow, links[choice], jump)
+        else:
+            positions = jump
+
+    batch_ranks = batch_counts / batch_counts.sum(axis=1, keepdims=True)
+    ranks = batch_counts.sum(axis=0) / batch_counts.sum()
+    if batches > 1:
+        errors = batch_ranks.std(axis=0, ddof=1) / np.sqrt(batches)
+    else:
+        errors = np.full(size, np.nan)
+    return dict(zip(pages, ranks.tolist())), dict(zip(pages, errors.tolist()))
+
+
 if __name__ == "__main__":
     main()